@@ -27,38 +27,395 @@
     SOFTWARE.
     ----------------------------------------------------------------------------------
 """
+import atexit
+import copy
+import logging
+import re
 import sys
+import threading
+import time
+from collections import OrderedDict
 from os import path
 
 project_dir = path.dirname(__file__)      #   Example: "/home/julian/Documents/platform"
 #sys.path.append(project_dir + '/venv/lib/python3.8/site-packages')
 
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from neo4j import __version__ as neo4j_driver_version
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
 
 
-class Neo4jLiaison:
+logger = logging.getLogger(__name__)    # Queries are logged at DEBUG level
+
+# Names of labels, relationships and attributes that may be safely spliced into a Cypher string
+_NAME_REGEX = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_MISSING = object()     # Sentinel for cache misses (None is a legitimate cached value)
+
+# Drivers shared by all the Neo4jLiaison objects of this process.  Key: (url, user, pwd)
+_DRIVERS = {}
+_DRIVERS_LOCK = threading.Lock()
+
+# Next value of the "id" attribute to issue, shared by all the Neo4jLiaison objects of this process that use the same driver
+# and database - so that they never issue the same value.  Key: (driver key, database, label).  Protected by _DRIVERS_LOCK
+_NEXT_IDS = {}
+
+_BATCH_SIZE = 10000     # Default max number of rows to send in a single bulk query, to keep the messages to the server manageable
+
+
+
+def _chunks(rows: list, size: int):
+    """
+    Split the given list into consecutive sub-lists of (at most) the given size
+
+    :param rows:    A list
+    :param size:    The max number of elements in each sub-list
+    :return:        A generator of lists.  EXAMPLE: _chunks([1, 2, 3], 2) yields [1, 2] and then [3]
+    """
+    if size < 1:
+        raise Exception(F"The batch size must be a positive integer (value passed: {size})")
+
+    for start in range(0, len(rows), size):
+        yield rows[start : start+size]
+
+
+
+def _column_key(result_obj, field_name: str):
+    """
+    Return the position of the given field among the ones returned by the query, so that its values can be
+    extracted from each record positionally, rather than by a lookup of its name.
+    If the field isn't present, return its name unchanged (the driver will then yield None values for it)
+
+    :param result_obj:  A neo4j.Result or neo4j.AsyncResult object
+    :param field_name:  A string with the name of a field returned by the query.  EXAMPLE: "user_id"
+    :return:            An integer with the position of the field, or the string field_name
+    """
+    keys = result_obj.keys()        # EXAMPLE: ("user_id",)
+    if field_name in keys:
+        return keys.index(field_name)
+
+    return field_name
+
+
+
+def _run_and_count(tx, cypher: str, cypher_dict: {}):
+    """
+    Transaction function (for use with execute_write()) that runs the given query, discarding any returned records
+
+    :param tx:          A neo4j.ManagedTransaction object
+    :param cypher:      A string containing a Cypher query
+    :param cypher_dict: Dictionary of data binding for the Cypher string
+    :return:            A neo4j.SummaryCounters object.  EXAMPLE of its attributes: nodes_created, properties_set
+    """
+    return tx.run(cypher, cypher_dict).consume().counters
+
+
+
+class _LRUCache:
+    """
+    A small thread-safe Least-Recently-Used cache, in which every entry may be tagged with Neo4j labels,
+    so that all the entries involving a given label can be evicted at once.
+    Entries may optionally expire after a fixed time.
+    Hits and misses are counted
+    """
+
+    def __init__(self, maxsize: int, ttl=None):
+        """
+        :param maxsize: The maximum number of entries to keep; if 0 or less, nothing gets cached
+        :param ttl:     Optional number of seconds after which entries expire; if None, they never do
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()      # Key: cache key.  Value: triplet (value, set of labels, expiration time or None)
+        self._label_index = {}          # Key: label.  Value: set of the cache keys tagged with that label
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def get(self, key, default=_MISSING):
+        """
+        Return the value cached under the given key, and mark it as the most recently used;
+        if not present, return the given default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._discard(key)      # Expired
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+
+    def set(self, key, value, tags=()) -> None:
+        """
+        Save the given value under the given key, tagged with the given labels,
+        evicting the least recently used entry if the cache is full
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+
+        with self._lock:
+            self._discard(key)
+            self._data[key] = (value, set(tags), expires)
+            for label in tags:
+                self._label_index.setdefault(label, set()).add(key)
+
+            while len(self._data) > self.maxsize:
+                self._discard(next(iter(self._data)))
+
+
+    def invalidate_labels(self, labels) -> None:
+        """
+        Evict all the entries tagged with any of the given labels
+        """
+        with self._lock:
+            for label in labels:
+                for key in list(self._label_index.get(label, ())):
+                    self._discard(key)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._label_index.clear()
+
+
+    def stats(self) -> {}:
+        """
+        Return a dictionary with the keys "hits", "misses", "size" and "maxsize"
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+    def _discard(self, key) -> None:
+        # Remove the given key (if present) from the cache and from the label index.  The lock must be held by the caller
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for label in entry[1]:
+            keys = self._label_index.get(label)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._label_index[label]
+
+# END class "_LRUCache"
+
+
+
+def shutdown_all() -> None:
+    """
+    Close all the drivers shared by the Neo4jLiaison objects of this process, terminating their database connections.
+    Automatically invoked at exit; also handy in tests.
+    Neo4jLiaison objects created before this call can no longer be used
+
+    :return:    None
+    """
+    with _DRIVERS_LOCK:
+        drivers = list(_DRIVERS.values())
+        _DRIVERS.clear()
+        _NEXT_IDS.clear()
+
+    for driver in drivers:
+        driver.close()
+
+atexit.register(shutdown_all)
+
+
+
+class _CypherCompiler:
+    """
+    Assembly and caching of the Cypher strings shared by Neo4jLiaison and AsyncNeo4jLiaison.
+    Subclasses must set self._cypher_cache to an empty dictionary
+    """
+
+    @staticmethod
+    def _validate_name(name: str, kind="label") -> str:
+        """
+        Make sure that the given name (of a label, relationship or attribute) is safe to splice into a Cypher string.
+        In case of failure, an Exception is thrown
+
+        :param name:    A string with the name to check
+        :param kind:    A string with the kind of name, used in the error message.  EXAMPLE: "relationship"
+        :return:        The name, unchanged
+        """
+        if not isinstance(name, str) or not _NAME_REGEX.match(name):
+            raise Exception(F"Invalid {kind} name: `{name}`.  Only letters, digits and underscores are allowed, and it cannot start with a digit")
+
+        return name
+
+
+
+    def _cypher_for(self, key: tuple, builder) -> str:
+        """
+        Return the Cypher string previously compiled under the given key; if not yet present, build it and save it.
+        Re-using the identical string for identical shapes of queries lets Neo4j re-use its cached query plan
+
+        :param key:     A tuple of the form (method_name, label, rel_name, tuple of attribute names)
+        :param builder: A function with no arguments, returning the Cypher string to use in case of a cache miss
+        :return:        A string with a Cypher query
+        """
+        cypher = self._cypher_cache.get(key)
+        if cypher is None:
+            cypher = builder()
+            self._cypher_cache[key] = cypher
+
+        return cypher
+
+
+
+    def _cypher_node_by_id(self, label: str) -> str:
+        # Cypher to look up a node by label and "id" attribute.  EXAMPLE: "MATCH (n:patient {id:$id}) RETURN n"
+        return self._cypher_for(("retrieve_node_by_label_and_id", label, None, ()),
+                                lambda: "MATCH (n:%s {id:$id}) RETURN n" % self._validate_name(label))
+
+
+
+    def _cypher_node_by_clause(self, label: str, attribute_names: tuple) -> str:
+        # Cypher to look up nodes by label and by the values of the given attributes (passed as data binding with the same names)
+        # EXAMPLE:  "MATCH (n:patient) WHERE n.age = $age AND n.gender = $gender RETURN n"
+        def build_cypher():
+            self._validate_name(label)
+            conditions = [F"n.{self._validate_name(key, 'attribute')} = ${key}" for key in attribute_names]
+            if not conditions:
+                return "MATCH (n:%s) RETURN n" % label
+            return "MATCH (n:%s) WHERE %s RETURN n" % (label, " AND ".join(conditions))
+
+        return self._cypher_for(("retrieve_node_by_label_and_clause", label, None, attribute_names), build_cypher)
+
+
+
+    def _cypher_create_nodes(self, label: str) -> str:
+        # Cypher to create nodes with the given label from the list of maps in the data binding "rows".
+        # Each row is passed as a map, so that the same Cypher string (and therefore the same query plan)
+        # serves all property sets for a given label.  EXAMPLE:  "UNWIND $rows AS row CREATE (n:patient) SET n = row"
+        return self._cypher_for(("create_nodes", label, None, ()),
+                                lambda: "UNWIND $rows AS row CREATE (n:%s) SET n = row" % self._validate_name(label))
+
+
+
+    def _cypher_children(self, label: str, rel_name: str) -> str:
+        # Cypher to retrieve the children of a node identified by label and "id" attribute, together with their labels
+        # EXAMPLE:  "MATCH (n:patient {id:$id})-[:HAS_RESULT]->(m) RETURN m, labels(m) AS labels"
+        return self._cypher_for(("retrieve_children", label, rel_name, ()),
+                                lambda: "MATCH (n:%s {id:$id})-[:%s]->(m) RETURN m, labels(m) AS labels"
+                                        % (self._validate_name(label), self._validate_name(rel_name, "relationship")))
+
+
+
+    def _cypher_change_attribute(self, label: str, attribute_name: str) -> str:
+        # Cypher to set the value of one attribute in a node identified by label and "id" attribute
+        # EXAMPLE:  "MATCH (n:patient) WHERE n.id = $node_id SET n.age = $new_attribute_value"
+        return self._cypher_for(("change_single_attribute_by_id", label, None, (attribute_name,)),
+                                lambda: "MATCH (n:%s) WHERE n.id = $node_id SET n.%s = $new_attribute_value"
+                                        % (self._validate_name(label), self._validate_name(attribute_name, "attribute")))
+
+
+
+    def _cypher_change_attributes_bulk(self, label: str) -> str:
+        # Cypher to set attribute values in many nodes identified by label and "id" attribute, from the list of maps
+        # in the data binding "updates".  EXAMPLE:  "UNWIND $updates AS u MATCH (n:task {id: u.id}) SET n += u.props"
+        return self._cypher_for(("change_attributes_bulk", label, None, ()),
+                                lambda: "UNWIND $updates AS u MATCH (n:%s {id: u.id}) SET n += u.props" % self._validate_name(label))
+
+
+
+    def _cypher_upsert_nodes(self, label: str, key: str) -> str:
+        # Cypher to create or update nodes with the given label, matched on the given key attribute,
+        # from the list of maps in the data binding "rows"
+        # EXAMPLE:  "UNWIND $rows AS r MERGE (n:patient {id: r.id}) ON CREATE SET n = r ON MATCH SET n += r"
+        return self._cypher_for(("upsert_nodes", label, None, (key,)),
+                                lambda: "UNWIND $rows AS r MERGE (n:%s {%s: r.%s}) ON CREATE SET n = r ON MATCH SET n += r"
+                                        % (self._validate_name(label), self._validate_name(key, "attribute"), key))
+
+# END class "_CypherCompiler"
+
+
+
+class Neo4jLiaison(_CypherCompiler):
     """
     To access a Neo4j database.
     It provides a higher-level wrapper around the Neo4j python connectivity library "Neo4j Python Driver".
-    Tested on version 4.0.6 of Neo4j Community Edition, with version 4.1.0 of the Neo4j Python Driver"
+    Requires version 5.8 or later of the Neo4j Python Driver (for managed transactions with execute_read() / execute_write(),
+    and for the driver's shared bookmark manager), and version 4.4 or later of Neo4j (for "CREATE CONSTRAINT ... IF NOT EXISTS")
 
     Documentation: https://neo4j.com/docs/api/python-driver/current/api.html
     """
 
-    def __init__(self, url: str, user: str, pwd: str):
+    def __init__(self, url: str, user: str, pwd: str, *,
+                 max_connection_pool_size=100, connection_acquisition_timeout=60.0, max_connection_lifetime=3600,
+                 keep_alive=True, onehop_cache_size=0, onehop_cache_ttl=60, query_cache_size=0, query_cache_ttl=60,
+                 database=None):
         """
 
-        :param url:     URL to connect to database with.  EXAMPLE: "neo4j://localhost:7687"
-        :param user:    Username to connect to database with
-        :param pwd:     Password to connect to database with
+        Creating a driver is expensive, and its connection pool is only effective if shared:  therefore, a single driver
+        is created per process for any given url/user/pwd combination, and shared among all the Neo4jLiaison objects
+        that use it.  Its connection-pool settings are those passed when the first of those objects is created
+
+        :param url:                             URL to connect to database with.  EXAMPLE: "neo4j://localhost:7687"
+        :param user:                            Username to connect to database with
+        :param pwd:                             Password to connect to database with
+        :param max_connection_pool_size:        Max number of connections to the database kept by the driver;
+                                                    it bounds how many queries can run concurrently
+        :param connection_acquisition_timeout:  Max number of seconds to wait for a free connection from the pool
+        :param max_connection_lifetime:         Number of seconds after which pooled connections get replaced
+        :param keep_alive:                      Whether to enable TCP keep-alive on the connections
+        :param onehop_cache_size:               Max number of results of retrieve_node_by_label_and_id() and retrieve_children()
+                                                    to keep in memory.
+                                                    By default 0, i.e. no caching:  the cache belongs to this object only,
+                                                    and changes made through other objects, processes or clients
+                                                    go unnoticed until the cached results expire (see onehop_cache_ttl)
+        :param onehop_cache_ttl:                Number of seconds after which the results cached by retrieve_node_by_label_and_id()
+                                                    and retrieve_children() expire; if None, they never expire
+        :param query_cache_size:                Max number of results of read-only query_list_single_field() and
+                                                    query_list_multiple_fields_dict() calls to keep in memory.
+                                                    By default 0, i.e. no caching:  the cache belongs to this object only,
+                                                    and changes made through other objects, processes or clients
+                                                    go unnoticed until the cached results expire (see query_cache_ttl)
+        :param query_cache_ttl:                 Number of seconds after which the results cached by query_list_single_field()
+                                                    and query_list_multiple_fields_dict() expire
+        :param database:                        Name of the database to run all queries on.  EXAMPLE: "neo4j"
+                                                    If None, the user's home database is used (for backward compatibility);
+                                                    but setting it is recommended, since otherwise the driver may need
+                                                    an extra round trip to the server to resolve the home database
         """
 
         self._driver = None             # Object to connect to Neo4j's Bolt driver for Python
-        self._current_session = None    # A neo4j.Session object
-
+        self._db = database             # Name of the database used by all sessions
+        self._cypher_cache = {}         # Compiled Cypher strings.  Key: (method_name, label, rel_name, tuple of attribute names)
+        self._onehop_cache = _LRUCache(maxsize=onehop_cache_size, ttl=onehop_cache_ttl)   # Results of one-hop lookups from a node
+                                                                                        # identified by label and id, tagged by
+                                                                                        # the labels of all the nodes involved
+        self._query_cache = _LRUCache(maxsize=query_cache_size, ttl=query_cache_ttl)  # Results of read-only generic queries.
+                                                                                    # Key: (method_name, field_name, cypher, sorted data binding)
+        self._constrained = set()       # Pairs (label, key) for which a uniqueness constraint is known to exist
+
+        key = (url, user, pwd)
+        self._driver_key = key          # Identifies the driver shared by all the Neo4jLiaison objects with the same credentials
         try:
-            self._driver = GraphDatabase.driver(url, auth=(user, pwd))  # Create a driver object
+            with _DRIVERS_LOCK:
+                self._driver = _DRIVERS.get(key)
+                if self._driver is None:
+                    self._driver = GraphDatabase.driver(url, auth=(user, pwd),     # Create a driver object
+                                                        max_connection_pool_size=max_connection_pool_size,
+                                                        connection_acquisition_timeout=connection_acquisition_timeout,
+                                                        max_connection_lifetime=max_connection_lifetime,
+                                                        keep_alive=keep_alive)
+                    _DRIVERS[key] = self._driver
         except Exception as ex:
             error_msg = "CHECK IF NEO4J IS RUNNING! While instantiating the Neo4jLiaison object, failed to create the driver: " + str(ex)
             raise Exception (error_msg)
@@ -74,14 +431,69 @@ class Neo4jLiaison:
 
     def close(self) -> None:
         """
-        Terminate the database connection.
+        Detach this object from the database driver, which is shared with other Neo4jLiaison objects
+        and thus stays open:  use the module-level shutdown_all() to terminate all the database connections.
         Note: this method is automatically invoked after the last operation of a "with" statement
 
         :return:    None
         """
 
-        if self._driver is not None:
-            self._driver.close()
+        self._driver = None
+
+
+
+    def _invalidate_all(self) -> None:
+        """
+        Discard all cached query results; used after a generic query that may have modified the data
+
+        :return:    None
+        """
+        self._onehop_cache.clear()
+        self._query_cache.clear()
+
+
+
+    def _invalidate_labels(self, labels) -> None:
+        """
+        Discard all cached query results that might be affected by a change to nodes with any of the given labels
+
+        :param labels:  A list of strings with Neo4j labels
+        :return:        None
+        """
+        self._onehop_cache.invalidate_labels(labels)
+        self._query_cache.clear()       # Generic queries aren't tagged with labels
+
+
+
+    @staticmethod
+    def _query_cache_key(method_name: str, field_name, cypher: str, cypher_dict):
+        """
+        Return the key under which to cache the result of a generic read query, or None if it shouldn't be cached
+        (i.e. if the data binding contains unhashable values such as lists)
+
+        :return:    A tuple, or None
+        """
+        key = (method_name, field_name, cypher.strip(), tuple(sorted((cypher_dict or {}).items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+
+
+    def cache_stats(self) -> {}:
+        """
+        Return statistics about the in-memory caches of query results
+
+        :return:    A dictionary with the keys "onehop" (for the results of retrieve_node_by_label_and_id() and retrieve_children())
+                        and "query" (for the results of query_list_single_field() and query_list_multiple_fields_dict()).
+                        Each value is a dictionary with the keys "hits", "misses", "size" and "maxsize"
+                        EXAMPLE: {"onehop": {"hits": 120, "misses": 8, "size": 8, "maxsize": 10000},
+                                  "query": {"hits": 15, "misses": 4, "size": 4, "maxsize": 1024}}
+        """
+        return {"onehop": self._onehop_cache.stats(), "query": self._query_cache.stats()}
 
 
 
@@ -93,7 +505,14 @@ class Neo4jLiaison:
 
     def new_session(self):
         """
-        Create, save and return a neo4j.Session object (used to run Cypher queries)
+        Create and return a new neo4j.Session object (used to run Cypher queries), on the database
+        specified at instantiation.
+        Sessions are not thread-safe, and are not saved:  the caller is responsible for closing it,
+        best done with a "with" statement.
+        All sessions share the driver's bookmark manager, so that (even in a cluster) every query sees the changes
+        made by the queries previously run through the same driver - by this or by any other Neo4jLiaison object.  EXAMPLE:
+            with conn.new_session() as sess:
+                result = sess.run("MATCH (n:patient) RETURN count(n) AS n_patients").single()
 
         :return:    A new neo4j.Session object
         """
@@ -101,22 +520,102 @@ class Neo4jLiaison:
         if self._driver is None:
             raise Exception("Calling the session() method, but self._driver isn't set")
 
-        self._current_session = self._driver.session()  # Save the session for future use
-        return self._current_session
+        return self._driver.session(database=self._db,
+                                    bookmark_manager=self._driver.execute_query_bookmark_manager)  # For read-your-writes consistency
 
 
 
     def get_session(self):
         """
-        Retrieve, or possibly create, a "session" object
+        Create a new "session" object.  Same as new_session(), which is now preferred;
+        sessions are no longer re-used, since they are not safe to share among threads
 
-        :return:    A neo4j.Session object
+        :return:    A new neo4j.Session object
         """
 
-        if self._current_session is not None:
-            return self._current_session
-        else:
-            return self.new_session()
+        return self.new_session()
+
+
+
+    def _run(self, cypher: str, cypher_dict=None, consumer=None, write=True):
+        """
+        Run a general Cypher query in a new session, as a managed (read or write) transaction,
+        without affecting the cached query results,
+        and process its result before the transaction gets closed.
+        Managed transactions are automatically retried on transient errors (e.g. deadlocks or leader switches);
+        therefore, the consumer function may get invoked more than once
+
+        :param cypher:      A string containing a Cypher query
+        :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param consumer:    Function to apply to the neo4j.Result object while the transaction is still open;
+                                it must fully consume the result.
+                                If None, Result.data() is used, i.e. a list of dictionaries is returned
+        :param write:       If True (default), run a write transaction; if False, a read one.
+                                The caller must state it: it can't be reliably guessed from the Cypher string
+
+        :return:            Whatever the consumer function returns
+        """
+
+        if cypher_dict is None:
+            cypher_dict = {}
+
+        if consumer is None:
+            consumer = lambda result_obj: result_obj.data()
+
+        def work(tx):
+            result_obj = tx.run(cypher, cypher_dict)     # A new neo4j.Result object, only valid while the transaction is open
+            return consumer(result_obj)
+
+        with self.new_session() as sess:
+            if write:
+                return sess.execute_write(work)
+            else:
+                return sess.execute_read(work)
+
+
+
+    def _iter_run(self, cypher: str, cypher_dict=None, converter=None, write=True):
+        """
+        Run a general Cypher query in a new session, and return a generator that yields its records one by one,
+        as they arrive from the database.  The session is closed when the generator is exhausted or closed.
+        Since the records leave the transaction as they arrive, an auto-commit transaction is used,
+        which - unlike in _run() - doesn't get automatically retried in case of transient errors.
+        However, if the connection turns out to be stale (the server reset it, or became unavailable)
+        before any record is yielded, a read-only query (write=False) is retried once, in a fresh session
+
+        :param cypher:      A string containing a Cypher query
+        :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param converter:   Function to apply to each neo4j.Record object before yielding it.
+                                If None, the neo4j.Record objects are yielded unchanged
+        :param write:       If True (default), the query is taken to possibly modify data:
+                                it doesn't get retried, and all cached query results are discarded afterwards
+
+        :return:            A generator
+        """
+
+        if cypher_dict is None:
+            cypher_dict = {}
+
+        try:
+            for attempt in (1, 2):
+                yielded = False
+                try:
+                    with self.new_session() as sess:
+                        for record in sess.run(cypher, cypher_dict):
+                            yielded = True
+                            yield record if converter is None else converter(record)
+                    break
+
+                except (SessionExpired, ServiceUnavailable) as ex:
+                    # Retrying is only safe if the caller hasn't seen any partial result, and if the query can't have modified data
+                    if yielded or write or attempt == 2:
+                        raise
+                    logger.warning("Stale connection while running a query; retrying it in a new session.  Error: %s", ex)
+
+        finally:
+            # Also if the caller stops early (or an error occurs):  the query may have modified the data anyway
+            if write:
+                self._invalidate_all()
 
 
 
@@ -130,7 +629,9 @@ class Neo4jLiaison:
         """
         Return the record corresponding to a Neo4j node identified by the given label, and by
         an "id" attribute with a value as specified,
-        within the context of the given session
+        in a new session.
+        If enabled (see onehop_cache_size in the constructor), results are cached for a limited time (see onehop_cache_ttl),
+        or until a modification involving any of the node's labels is made through this object
         TODO: add a version that looks up the value of a single field
 
         EXAMPLE:
@@ -144,19 +645,20 @@ class Neo4jLiaison:
                             if not found, return None
         """
 
-        sess = self.get_session()       # Retrieve or create a "session" object
+        cache_key = ("retrieve_node_by_label_and_id", label, id_value)
+        cached = self._onehop_cache.get(cache_key)
+        if cached is not _MISSING:
+            return copy.deepcopy(cached)    # A deep copy, so that the caller cannot alter the cached value (e.g. lists in it)
 
-        cypher = "MATCH (n:%s {id:$id}) RETURN n" % label   # Construct the Cypher string
+        cypher = self._cypher_node_by_id(label)
         #print("In retrieve_node_by_label_and_id(). Cypher: " + cypher)
 
-        result_obj = sess.run(cypher, id=id_value)   # A new neo4j.Result object
-        # Alternate way:
-        # result_obj = sess.run(cypher, {"id" : id})
-
-        record = result_obj.single()    # Obtain the record from this result if available; else, return None
+        # Obtain the record from the result if available; else, None
+        record = self._run(cypher, {"id": id_value}, consumer=lambda result_obj: result_obj.single(), write=False)
         #print("record: ", record)
 
         if record is None:
+            self._onehop_cache.set(cache_key, None, tags={label})
             return None
 
         node = record[0]    # Object of type neo4j.graph.Node
@@ -172,56 +674,49 @@ class Neo4jLiaison:
                                                 # Type shows as : <class 'dict'>
                                                 # EXAMPLE: {'id': 123, 'gender': 'F', 'dob': '18-Jul-95'}
 
+        self._onehop_cache.set(cache_key, copy.deepcopy(dict_from_node), tags={label, *node.labels})
+
         return dict_from_node
 
 
 
-    def retrieve_node_by_label_and_clause(self, label: str, clause: str) -> [{}]:
+    def retrieve_node_by_label_and_clause(self, label: str, clause: {}, as_dict=True) -> [{}]:
         """
         Return the records corresponding to all the Neo4j nodes with the specified label,
-        and satisfying the given clause,
-        within the context of the given session.
-        The node referred to in the clause must be specified as "n."
+        and whose attributes equal all the values given in the clause dictionary,
+        in a new session.
+        The values are passed to the database as query parameters, never spliced into the Cypher string
         TODO: offer an option to specify a list of desired fields (e.g. "id", "name_short")
 
-        If a more general lookup is needed, use query_list_multiple_fields_dict() instead.
+        If a more general lookup is needed (e.g. inequalities), use query_list_multiple_fields_dict() instead.
 
         EXAMPLE:
-            nodes = conn.retrieve_node_by_label_and_clause("patient", "n.'gender'='F' AND n.'age' > 21")
+            nodes = conn.retrieve_node_by_label_and_clause("patient", {"gender": "F", "age": 21})
+            # Equivalent to the Cypher:  MATCH (n:patient) WHERE n.gender = $gender AND n.age = $age RETURN n
 
         :param label:   A string with a Neo4j label
-        :param clause:  String with a clause to define the search; the node it refers to must be specified as "n."
+        :param clause:  A dictionary of attribute names/values that the nodes must match.  EXAMPLE: {"gender": "F"}
+        :param as_dict: If False, skip the conversion to dictionaries, and return the neo4j.graph.Node objects
+                            (whose attributes can still be read with node["gender"], node.get("gender") or node.items())
 
         :return:        A list whose entries are dictionaries with each record's information (the node's attribute names are the keys)
+                            EXAMPLE:  [{'gender': 'F', 'id': 49, 'age': 21}, {'gender': 'F', 'id': 53, 'age': 21}]
         """
 
-        sess = self.get_session()       # Retrieve or create a "session" object
-
-        cypher = "MATCH (n:%s) WHERE %s RETURN n" % (label, clause)   # Construct the Cypher string
-        print("In retrieve_node_by_label_and_clause(). Cypher query: ", cypher)
-
-        # Run the query, which returns a "Neo4j result" object
-        result_obj = sess.run(cypher)   # A new neo4j.Result object
-
-        #print(list(result_obj))        # WARNING: this will "consume" the result object!
-
-        # Turn the result into a list of dictionaries
-        result_list = []
-        for record in result_obj:
-            #print("Record:", record)         # EXAMPLE:  <Record n=<Node id=2273663 labels=frozenset({'person', 'patient'}) properties={'gender': 'F', 'id': 49, 'age': 23}>>
-            node_object = record[0]           # Object of type neo4j.graph.Node
-            #print("Node data:", node_object) # EXAMPLE:  <Node id=2273663 labels=frozenset({'person', 'patient'}) properties={'gender': 'F', 'id': 49, 'age': 23}>
-
-            node_as_items = node_object.items()     # An iterable of all property name-value pairs.  Type is:  <class 'dict_items'>
-            #print(node_as_items)                   # EXAMPLE: dict_items([('gender', 'F'), ('id', 49), ('age', 23)])
+        if not isinstance(clause, dict):
+            raise Exception("retrieve_node_by_label_and_clause(): the clause must be a dictionary of attribute names/values")
 
-            dict_from_node = dict(node_as_items)    # Construct a dictionary from the contents of the iterable
-            # Type shows as : <class 'dict'>
-            #print(dict_from_node)                  # EXAMPLE: {'gender': 'F', 'id': 49, 'age': 23}
+        cypher = self._cypher_node_by_clause(label, tuple(sorted(clause)))   # EXAMPLE: "... WHERE n.age = $age AND n.gender = $gender ..."
+        logger.debug("In retrieve_node_by_label_and_clause(). Cypher query: %s", cypher)
 
-            result_list.append(dict_from_node)
+        if not as_dict:
+            # List of objects of type neo4j.graph.Node
+            # EXAMPLE:  [<Node id=2273663 labels=frozenset({'person', 'patient'}) properties={'gender': 'F', 'id': 49, 'age': 21}>, ...]
+            return self._run(cypher, clause, consumer=lambda result_obj: result_obj.value("n"), write=False)
 
-        #print(result_list)                         # Each entry in the list is a dictionary such as {'gender': 'F', 'id': 49, 'age': 23}
+        # Run the query, and let the driver turn the result into a list of dictionaries in one step
+        # EXAMPLE of the data:  [{'n': {'gender': 'F', 'id': 49, 'age': 21}}, {'n': {'gender': 'F', 'id': 53, 'age': 21}}]
+        result_list = [record["n"] for record in self._run(cypher, clause, write=False)]
 
         return result_list
 
@@ -230,7 +725,9 @@ class Neo4jLiaison:
     def retrieve_children(self, label, id_value, rel_name:str, order="") -> [{}]:
         """
         Retrieve all the children of a Neo4j node identified by the given label, and an "id" attribute with a value as specified,
-        within the context of the given session
+        in a new session.
+        If enabled (see onehop_cache_size in the constructor), results are cached for a limited time (see onehop_cache_ttl),
+        or until a modification involving the labels of the parent or of any child is made through this object
 
         :param label:       A string with a Neo4j label
         :param id_value:    A value to match an attribute named "id" in the node
@@ -242,11 +739,14 @@ class Neo4jLiaison:
                     EXAMPLE:  [ {'id': 190, 'date_collected': '17-Feb-20'},
                                 {'id': 62, 'date_collected': '11-May-19'} ]
         """
-        sess = self.get_session()       # Retrieve or create a "session" object
+        cache_key = ("retrieve_children", label, id_value, rel_name)
+        cached = self._onehop_cache.get(cache_key)
+        if cached is not _MISSING:
+            return list(copy.deepcopy(cached))      # Deep copies, so that the caller cannot alter the cached values (e.g. lists in them)
 
-        cypher = "MATCH (n:%s {id:$id})-[:%s]->(m) RETURN m" % (label, rel_name)
-        print("In retrieve_children(): ", cypher)
-        result_obj = sess.run(cypher, id=id_value, rel_name=rel_name)  # A new neo4j.Result object
+        cypher = self._cypher_children(label, rel_name)
+        logger.debug("In retrieve_children(): %s", cypher)
+        result_as_list_dict = self._run(cypher, {"id": id_value}, write=False)   # Uses result_obj.data(), which returns a list of dictionaries
 
         #print(result_obj)   # neo4j.work.result.Result object
         #print("Result converted to list: ", list(result_obj))
@@ -260,43 +760,75 @@ class Neo4jLiaison:
         # EXAMPLE:  [<Node id=2273968 labels=frozenset({'person', 'patient'}) properties={'id': 190,'date_collected': '17-Feb-20'}>,
         #            <Node id=2273967 labels=frozenset({'person', 'patient'}) properties={'id': 62, 'date_collected': '11-May-19'}>]
 
-        result_as_list_dict = result_obj.data()             # Returns a list of dictionaries
         #print("Result data: ", result_as_list_dict)        # Returns a list of dictionaries
-        # EXAMPLE:  [{'m': {'id': 190, 'date_collected': '17-Feb-20'}},
-        #            {'m': {'id': 62, 'date_collected': '11-May-19'}}
+        # EXAMPLE:  [{'m': {'id': 190, 'date_collected': '17-Feb-20'}, 'labels': ['person', 'patient']},
+        #            {'m': {'id': 62, 'date_collected': '11-May-19'}, 'labels': ['person', 'patient']}
         #           ]
 
         children = [i["m"] for i in result_as_list_dict]
-        print("result: ", children)  # EXAMPLE:  [ {'id': 190, 'date_collected': '17-Feb-20'},
-                                     #             {'id': 62, 'date_collected': '11-May-19'} ]
+        logger.debug("result: %s", children)    # EXAMPLE:  [ {'id': 190, 'date_collected': '17-Feb-20'},
+                                                #             {'id': 62, 'date_collected': '11-May-19'} ]
+
+        tags = {label}.union(*[i["labels"] for i in result_as_list_dict])
+        self._onehop_cache.set(cache_key, copy.deepcopy(tuple(children)), tags=tags)
+
         return children
 
 
 
-    def query_list_single_field(self, field_name: str, cypher: str, cypher_dict=None) -> []:
+    def iter_children(self, label, id_value, rel_name: str):
+        """
+        Same as retrieve_children(), but return a generator that yields one dictionary per child node,
+        as the records arrive from the database - without first materializing them all in memory.
+        Not cached.
+
+        IMPORTANT: the underlying session stays open for the lifetime of the generator;
+                   make sure to exhaust it (e.g. with a "for" loop) or to call its close() method
+
+        :param label:       A string with a Neo4j label
+        :param id_value:    A value to match an attribute named "id" in the node
+        :param rel_name:    A string with the name of a relationship
+
+        :return:            A generator of dictionaries.  EXAMPLE of a yielded value: {'id': 190, 'date_collected': '17-Feb-20'}
+        """
+        cypher = self._cypher_children(label, rel_name)     # The same Cypher string (and query plan) as retrieve_children()
+        logger.debug("In iter_children(): %s", cypher)
+
+        # Record.data() turns the node into a dictionary of its attributes.
+        # EXAMPLE: {'m': {'id': 190, 'date_collected': '17-Feb-20'}, 'labels': ['result']}
+        return self._iter_run(cypher, {"id": id_value}, converter=lambda record: record.data()["m"], write=False)
+
+
+
+    def query_list_single_field(self, field_name: str, cypher: str, cypher_dict=None, no_cache=False, write=True) -> []:
         """
         Run a given Cypher query that returns a list of values for the specified SINGLE field name,
-        in the context of the current session
+        in a new session
 
         EXAMPLE 1:
             cypher = "MATCH(n:biomarker_type) RETURN n.classification AS classification"
-            with conn.new_session():            # The "with" statement is optional
-                result_list = conn.query_list("classification", cypher)
+            result_list = conn.query_list("classification", cypher)
 
         EXAMPLE 2:
             cypher = "MATCH (n:patient)" \
                      "WHERE n.username = $username AND n.passwd = $passwd " \
                      "RETURN n.id AS user_id"
-            with conn.new_session():            # The "with" statement is optional
-                result_list = self.conn.query_list("user_id", cypher, {"username": username, "passwd": passwd})
+            result_list = self.conn.query_list("user_id", cypher, {"username": username, "passwd": passwd})
 
         IMPORTANT:  if no "AS" statement is used in the Cypher query, then the field name must be
                     spelled out in full (e.g. "n.id")
 
+        If enabled (see query_cache_size in the constructor), results of read-only queries (write=False) are cached
+        for a limited time (see query_cache_ttl), or until any modification is made through this object
+
         :param field_name:  A string containing the name of the desired field (attribute)
         :param cypher:      A string containing a Cypher query.  Any name preceded by $ gets replaced by a value,
                                 as specified in cypher_dict, below
         :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param no_cache:    If True, don't use any cached result, but always query the database
+        :param write:       If True (default), the query is run in a write transaction, and all cached query results
+                                are discarded afterwards; pass False for a read-only query, which then gets run
+                                in a read transaction (possibly on a cluster's follower), and whose result may be cached
 
         :return:            A list of values for the requested field (attribute)
         """
@@ -304,42 +836,54 @@ class Neo4jLiaison:
         if cypher_dict is None:
             cypher_dict = {}
 
-        sess = self.get_session()       # Retrieve or create a "session" object
+        logger.debug("In query_list_single_field(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
 
-        print("In query_list_single_field(). Cypher query: ", cypher)
-        print("Cypher dictionary: ", cypher_dict)
+        cache_key = None if write else self._query_cache_key("query_list_single_field", field_name, cypher, cypher_dict)
+        if cache_key is not None and not no_cache:
+            cached = self._query_cache.get(cache_key)
+            if cached is not _MISSING:
+                return copy.deepcopy(list(cached))      # A deep copy, so that the caller cannot alter the cached value (e.g. lists in it)
 
-        # Run the query, which returns a response object
-        result_obj = sess.run(cypher, cypher_dict)     # A new neo4j.Result object
+        # Run the query, and turn its result into a list
         # print(list(result_obj)) # [<Record n.name='unknown'>, <Record n.name='John'>, ..., <Record n.name='Jane'>, <Record n.name='unknown'>]
-
-        # Turn the result into a list
-        result_list = result_obj.value(field_name)
+        # The position of the field is looked up once, rather than its name in each record
+        result_list = self._run(cypher, cypher_dict,
+                                consumer=lambda result_obj: result_obj.value(_column_key(result_obj, field_name)), write=write)
 
         # Alternate way:
         # result_list = [record[field_name] for record in result_obj]
 
+        if write:
+            self._invalidate_all()      # In case the query modified the data
+        elif cache_key is not None:
+            self._query_cache.set(cache_key, copy.deepcopy(tuple(result_list)))
+
         return result_list
 
 
 
-    def query_list_multiple_fields_dict(self, cypher: str, cypher_dict=None) -> [{}]:
+    def query_list_multiple_fields_dict(self, cypher: str, cypher_dict=None, no_cache=False, write=True) -> [{}]:
         """
         Run a given Cypher query that returns a list of dictionaries,
-        in the context of the current session (which gets created if not already present.)
+        in a new session
 
         Notes:
         In case of very few fields, a practical alternative is query_list_multiple_fields()
         If just doing a simple lookup by label and clause, may use retrieve_node_by_label_and_clause() instead.
+        If enabled (see query_cache_size in the constructor), results of read-only queries (write=False) are cached
+        for a limited time (see query_cache_ttl), or until any modification is made through this object
 
         EXAMPLE:
             cypher = "MATCH(n:biomarker_type) RETURN n.classification AS cls, n.subtype AS sub"
-            with conn.new_session():    # The "with" statement is optional
-                result_list = conn.query_list_multiple_fields_dict(cypher)
+            result_list = conn.query_list_multiple_fields_dict(cypher, write=False)
 
         :param cypher:      A string containing a Cypher query.  Any name preceded by $ gets replaced by a value,
                                 as specified in cypher_dict, below
         :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param no_cache:    If True, don't use any cached result, but always query the database
+        :param write:       If True (default), the query is run in a write transaction, and all cached query results
+                                are discarded afterwards; pass False for a read-only query, which then gets run
+                                in a read transaction (possibly on a cluster's follower), and whose result may be cached
 
         :return:            A list whose entries are dictionaries with each record's information
                             (the node's attribute names are the keys)
@@ -349,92 +893,124 @@ class Neo4jLiaison:
                             ]
         """
 
-        if cypher_dict is None:
-            cypher_dict = {}
+        logger.debug("In query_list_multiple_fields_dict(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
 
-        sess = self.get_session()       # Retrieve or create a "session" object
+        cache_key = None if write else self._query_cache_key("query_list_multiple_fields_dict", None, cypher, cypher_dict)
+        if cache_key is not None and not no_cache:
+            cached = self._query_cache.get(cache_key)
+            if cached is not _MISSING:
+                return list(copy.deepcopy(cached))      # Deep copies, so that the caller cannot alter the cached values (e.g. nested nodes)
 
-        print("In query_list_multiple_fields_dict(). Cypher query: ", cypher)
-        print("Cypher dictionary: ", cypher_dict)
+        # Run the query, and let the driver turn its result into a list of dictionaries (with Result.data()) before the transaction closes.
+        # Any node in the result also gets turned into a dictionary of its attributes.
+        # EXAMPLE of a record:  <Record cls='fatty acid' sub='lipid'>  ,  which becomes {'cls': 'fatty acid', 'sub': 'lipid'}
+        result_list = self._run(cypher, cypher_dict, write=write)
+        #print(result_list)      # Example: [{'cls': 'fatty acid', 'sub': 'lipid'}, {'cls': 'ultra long chain fatty acid', 'sub': 'lipid'}]
+
+        if write:
+            self._invalidate_all()      # In case the query modified the data
+        elif cache_key is not None:
+            self._query_cache.set(cache_key, copy.deepcopy(tuple(result_list)))
+
+        return result_list
 
-        # Run the query, which returns a "Neo4j result" object
-        result_obj = sess.run(cypher, cypher_dict)     # A new neo4j.Result object
 
-        # WARNING: the printing statement below will "consume" the result object!
-        #print("Response object:" , list(result_obj)) # [<Record n.name='unknown'>, <Record n.name='John'>, ..., <Record n.name='Jane'>]
 
-        # Turn the result into a list of dictionaries
-        """        
-        for record in result_obj:
-            print(record)           # Example: <Record cls='fatty acid' sub='lipid'>
-       
-        for record in result_obj:
-            print(tuple(record))    # Example: ('fatty acid', 'lipid')
-        
-        for record in result_obj:
-            print(dict(record))     # Example: {'cls': 'fatty acid', 'sub': 'lipid'}
+    def iter_query_list_multiple_fields_dict(self, cypher: str, cypher_dict=None, write=True):
         """
+        Same as query_list_multiple_fields_dict(), but return a generator that yields one dictionary per record,
+        as the records arrive from the database - without first materializing them all in memory.
 
-        result_list = [dict(record) for record in result_obj]
-        #print(result_list)      # Example: [{'cls': 'fatty acid', 'sub': 'lipid'}, {'cls': 'ultra long chain fatty acid', 'sub': 'lipid'}]
+        IMPORTANT: the underlying session stays open for the lifetime of the generator;
+                   make sure to exhaust it (e.g. with a "for" loop) or to call its close() method
 
-        return result_list
+        EXAMPLE:
+            cypher = "MATCH(n:biomarker_type) RETURN n.classification AS cls, n.subtype AS sub"
+            for record in conn.iter_query_list_multiple_fields_dict(cypher, write=False):
+                print(record["cls"])
+
+        :param cypher:      A string containing a Cypher query.  Any name preceded by $ gets replaced by a value,
+                                as specified in cypher_dict, below
+        :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param write:       If True (default), the query is taken to possibly modify data, and all cached query results
+                                are discarded afterwards; pass False for a read-only query, which then gets retried once
+                                if the connection turns out to be stale
 
+        :return:            A generator of dictionaries.  EXAMPLE of a yielded value: {'cls': 'fatty acid', 'sub': 'lipid'}
+        """
 
+        logger.debug("In iter_query_list_multiple_fields_dict(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
 
-    def query_list_multiple_fields(self, cypher: str, cypher_dict=None) -> [()]:
+        # EXAMPLE of a record:  <Record cls='fatty acid' sub='lipid'>  ,  which Record.data() turns into {'cls': 'fatty acid', 'sub': 'lipid'}
+        # (as in query_list_multiple_fields_dict(), any node also gets turned into a dictionary of its attributes)
+        return self._iter_run(cypher, cypher_dict, converter=lambda record: record.data(), write=write)
+
+
+
+    def query_list_multiple_fields(self, cypher: str, cypher_dict=None, write=True) -> [()]:
         """
         Run a given Cypher query that returns a list of tuple-valued entries,
-        in the context of the current session (which gets created if not already present)
+        in a new session
 
         Note: in case of a sizable numbers of fields, probably better to use query_list_multiple_fields_dict()
 
         EXAMPLE 1:
             cypher = "MATCH(n:biomarker_type) RETURN n.classification, n.subtype"
-            with conn.new_session():        # The "with" statement is optional
-                result_list = conn.query_list_multiple_fields(cypher)
+            result_list = conn.query_list_multiple_fields(cypher)
 
         EXAMPLE 2:
             cypher = "MATCH (n:patient {id:$client_id})-[*3..6]->(r:biomarker_result)-->(b:biomarker)  " \
                      "RETURN b.name, r.value"
-            with conn.new_session():       # The "with" statement is optional
-                result_list = self.conn.query_list_multiple_fields(cypher, {"client_id": 310})
+            result_list = self.conn.query_list_multiple_fields(cypher, {"client_id": 310})
 
         :param cypher:      A string containing a Cypher query.  Any name preceded by $ gets replaced by a value,
                                 as specified in cypher_dict, below
         :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param write:       If True (default), the query is run in a write transaction, and all cached query results
+                                are discarded afterwards; pass False for a read-only query, which then gets run
+                                in a read transaction (possibly on a cluster's follower)
 
         :return:            A list  of tuples
                             EXAMPLE: [(279.576, 'compoundX'), (4.09, 'compoundY')]
         """
 
-        if cypher_dict is None:
-            cypher_dict = {}
+        logger.debug("In query_list_multiple_fields(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
+
+        # Run the query, and turn its result into a list of tuples before the transaction closes
+        # EXAMPLE of a record:  <Record r.value=12.34 b.name='compoundX'>  ,  which tuple() turns into (12.34, 'compoundX')
+        result_list = self._run(cypher, cypher_dict, consumer=lambda result_obj: [tuple(record) for record in result_obj],
+                                write=write)
+        #print(result_list)      # Example: [(12.34, 'compoundX'), (4.09113968515024, 'compoundY')]
 
-        sess = self.get_session()       # Retrieve or create a "session" object
+        if write:
+            self._invalidate_all()      # In case the query modified the data
 
-        print("In query_list_multiple_fields(). Cypher query: ", cypher)
-        print("Cypher dictionary: ", cypher_dict)
+        return result_list
 
-        # Run the query, which returns a "Neo4j result" object
-        result_obj = sess.run(cypher, cypher_dict)     # A new neo4j.Result object
 
-        # WARNING: the printing statement below will "consume" the result object!
-        #print("Response object:" , list(result_obj)) # [<Record n.name='unknown'>, <Record n.name='John'>, ..., <Record n.name='Jane'>]
 
-        # Turn the result into a list of tuples
+    def iter_query_list_multiple_fields(self, cypher: str, cypher_dict=None, write=True):
         """
-        for record in result_obj:
-            print(record)           # Example: <Record r.value=12.34 b.name='compoundX'>
-        
-        for record in result_obj:
-            print(tuple(record))    # Example: (12.34, 'compoundX')
+        Same as query_list_multiple_fields(), but return a generator that yields one tuple per record,
+        as the records arrive from the database - without first materializing them all in memory.
+
+        IMPORTANT: the underlying session stays open for the lifetime of the generator;
+                   make sure to exhaust it (e.g. with a "for" loop) or to call its close() method
+
+        :param cypher:      A string containing a Cypher query.  Any name preceded by $ gets replaced by a value,
+                                as specified in cypher_dict, below
+        :param cypher_dict: Dictionary of data binding for the Cypher string.  EXAMPLE: {"subtype": "lipid"}
+        :param write:       If True (default), the query is taken to possibly modify data, and all cached query results
+                                are discarded afterwards; pass False for a read-only query, which then gets retried once
+                                if the connection turns out to be stale
+
+        :return:            A generator of tuples.  EXAMPLE of a yielded value: (279.576, 'compoundX')
         """
 
-        result_list = [tuple(record) for record in result_obj]
-        #print(result_list)      # Example: [(12.34, 'compoundX'), (4.09113968515024, 'compoundY')]
+        logger.debug("In iter_query_list_multiple_fields(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
 
-        return result_list
+        # EXAMPLE of a record:  <Record r.value=12.34 b.name='compoundX'>  ,  which tuple() turns into (12.34, 'compoundX')
+        return self._iter_run(cypher, cypher_dict, converter=tuple, write=write)
 
 
 
@@ -444,18 +1020,22 @@ class Neo4jLiaison:
         and return the next available value of the "id" attribute, treated as an Auto-Increment value.
         If no matches are found, return 1
 
+        If no clause is given, the value is issued by an in-process counter for the label:
+        only the first call for a given label queries the database, and every call reserves the value returned.
+        See next_available_ids() for the details
+
         :param label:   String with the name of the desired node label
         :param clause:  Optional string to restrict the search.  EXAMPLE: "type:'soc', subtype:'post'"
         :return:        An integer with the next available ID
         """
 
-        # Assemble the Cypher string
         if clause == "":
-            cypher = F"MATCH (n:{label}) RETURN 1+max(n.id) AS max_value"
-        else:
-            cypher = "MATCH (n:%s {%s}) RETURN 1+max(n.id) AS max_value" % (label, clause)
+            return self.next_available_ids(label, 1)
+
+        # The clause is spliced in as given (it's a Cypher map fragment, not a single name), while the label gets validated
+        cypher = "MATCH (n:%s {%s}) RETURN 1+max(n.id) AS max_value" % (self._validate_name(label), clause)
 
-        result_list = self.query_list_single_field("max_value", cypher)     # Returns a list with one single element
+        result_list = self.query_list_single_field("max_value", cypher, no_cache=True, write=False)     # Returns a list with one single element
         # Note: if no node was matched in the query, the result of the 1+max will be None
 
         result = result_list[0]         # Extract the single element of the list
@@ -468,6 +1048,146 @@ class Neo4jLiaison:
 
 
 
+    def next_available_ids(self, label: str, count: int) -> int:
+        """
+        Reserve a contiguous range of "count" values of the "id" attribute for nodes with the given label,
+        treated as Auto-Increment values, and return the first one.
+        EXAMPLE:  if 10 is returned for a count of 3, then the values 10, 11 and 12 are reserved for the caller
+
+        The database is only queried the first time that a label is encountered (or after refresh_id_counter());
+        after that, values are issued by an in-process counter, shared by all the Neo4jLiaison objects of this process
+        that connect with the same credentials to the same database.
+        Nodes created with an explicit "id" by create_node(), create_nodes() or upsert_nodes() move the counter forward
+        past their values.
+        IMPORTANT: if other processes also add nodes with that label, or if "id" values are written by any other means
+                   (e.g. run_query(), execute(), or change_single_attribute_by_id()), call refresh_id_counter() afterwards;
+                   and consider protecting the "id" values with create_unique_constraint()
+
+        :param label:   String with the name of the desired node label
+        :param count:   Number of consecutive values to reserve
+        :return:        An integer with the first of the reserved values
+        """
+
+        if count < 1:
+            raise Exception(F"next_available_ids(): the count must be a positive integer (value passed: {count})")
+
+        counter_key = (self._driver_key, self._db, label)
+
+        with _DRIVERS_LOCK:
+            primed = counter_key in _NEXT_IDS
+
+        if not primed:
+            self.prime_id_counters([label])     # Queries the database outside of the lock
+
+        with _DRIVERS_LOCK:
+            first_value = _NEXT_IDS[counter_key]
+            _NEXT_IDS[counter_key] += count
+
+        return first_value
+
+
+
+    def refresh_id_counter(self, label: str) -> None:
+        """
+        Re-synchronize, from the database, the in-process counter used by next_available_id()
+        and next_available_ids() for the given label.
+        Needed when other processes may also be adding nodes with that label
+
+        :param label:   String with the name of the desired node label
+        :return:        None
+        """
+        self.prime_id_counters([label])
+
+
+
+    def prime_id_counters(self, labels: [str]) -> None:
+        """
+        Initialize (or re-synchronize) from the database the in-process counters used by next_available_id()
+        and next_available_ids(), for all the given labels at once, in a single query.
+        Counters are never moved backwards, so that values already reserved (but possibly not yet written
+        to the database) don't get issued again
+
+        :param labels:  A list of strings with the names of node labels
+        :return:        None
+        """
+        if not labels:
+            return
+
+        next_ids = self._query_next_ids(labels)
+
+        with _DRIVERS_LOCK:
+            for label, db_value in next_ids.items():
+                counter_key = (self._driver_key, self._db, label)
+                _NEXT_IDS[counter_key] = max(_NEXT_IDS.get(counter_key, db_value), db_value)
+
+
+
+    def _advance_id_counter(self, label: str, rows: [{}]) -> None:
+        """
+        If the in-process counter for the given label is in use, move it past any integer "id" value in the given rows,
+        so that next_available_id() won't issue values that were just written to the database
+
+        :param label:   String with the name of a node label
+        :param rows:    A list of dictionaries, with the attributes of nodes that were created or updated
+        :return:        None
+        """
+        ids = [row["id"] for row in rows if isinstance(row.get("id"), int) and not isinstance(row.get("id"), bool)]
+        if not ids:
+            return
+
+        counter_key = (self._driver_key, self._db, label)
+        with _DRIVERS_LOCK:
+            if counter_key in _NEXT_IDS:    # Otherwise, the database will be queried when the counter is first needed
+                _NEXT_IDS[counter_key] = max(_NEXT_IDS[counter_key], 1 + max(ids))
+
+
+
+    def _query_next_ids(self, labels: [str]) -> {}:
+        """
+        Look up in the database the next available values of the "id" attribute for all the given labels,
+        with a single query
+
+        :param labels:  A list of strings with the names of node labels
+        :return:        A dictionary whose keys are the labels, and whose values are the next available "id" values
+                            (1 for labels without any nodes)
+        """
+        # One sub-query per label, combined into a single round trip.  EXAMPLE, for the labels "patient" and "doctor":
+        #       MATCH (n:patient) WITH max(n.id) AS m RETURN 'patient' AS label, 1+m AS max_value
+        #       UNION ALL MATCH (n:doctor) WITH max(n.id) AS m RETURN 'doctor' AS label, 1+m AS max_value
+        # The aggregation must not be grouped by the label literal:  a grouped aggregation over no matched nodes
+        # returns no rows at all, while an ungrouped one returns a single row with a null max
+        subqueries = [F"MATCH (n:{self._validate_name(label)}) WITH max(n.id) AS m RETURN '{label}' AS label, 1+m AS max_value"
+                      for label in labels]
+        cypher = " UNION ALL ".join(subqueries)
+
+        result_list = self.query_list_multiple_fields(cypher, write=False)     # EXAMPLE: [('patient', 524), ('doctor', None)]
+        # Note: if no node was matched in a sub-query, the result of its 1+max will be None
+
+        next_ids = {label: (max_value if max_value is not None else 1) for (label, max_value) in result_list}
+
+        return {label: next_ids.get(label, 1) for label in labels}     # Arbitrarily use 1 as the first Auto-Increment value
+
+
+
+    def create_unique_constraint(self, label: str, key="id") -> None:
+        """
+        Make sure that the database enforces uniqueness of the given attribute among the nodes with the given label,
+        by creating a uniqueness constraint (if not already present).
+        The constraint is also backed by an index, which speeds up lookups by that attribute.
+        Requires Neo4j 4.4+
+
+        :param label:   A string with a Neo4j label
+        :param key:     A string with the name of the attribute to be kept unique.  Default: "id"
+        :return:        None
+        """
+        cypher = "CREATE CONSTRAINT IF NOT EXISTS FOR (n:%s) REQUIRE n.%s IS UNIQUE" \
+                 % (self._validate_name(label), self._validate_name(key, "attribute"))
+
+        self._run(cypher, consumer=lambda result_obj: result_obj.consume(), write=True)
+        self._constrained.add((label, key))
+
+
+
     ###############################################################################
     #                                                                             #
     #                           METHODS TO MODIFY DATA                            #
@@ -476,37 +1196,104 @@ class Neo4jLiaison:
 
     def create_node(self, label: str, items: {}):
         """
-        Create a new node with the given label and with attributes/values specified in the items dictionary
+        Create a new node with the given label and with attributes/values specified in the items dictionary.
+        The dictionary is sent as a single map parameter:  no Cypher string gets assembled per call,
+        and one compiled query serves all nodes with the given label, regardless of their attribute names.
+        To create many nodes, create_nodes() is much faster
 
         :param label:   A string with a Neo4j label
         :param items:   A dictionary.  EXAMPLE: {'id': 123, 'gender': 'M'}
 
-        :return:        A neo4j.Result object
+        :return:        A neo4j.SummaryCounters object, with the statistics of the changes made.
+                            EXAMPLE:  counters.nodes_created is 1 , and counters.properties_set is 2
         """
 
-        #self.get_session()       # Retrieve or create a "session" object
+        # consume() discards any returned records, without requesting them from the server, and returns the summary
+        counters = self._run(self._cypher_create_nodes(label), {"rows": [items]},
+                             consumer=lambda result_obj: result_obj.consume().counters, write=True)
 
-        #print(F"In create_node(): label is `{label}` and items: {items}")
+        self._invalidate_labels([label])
+        self._advance_id_counter(label, [items])
 
-        # From the dictionary of attribute names/values, create a list of strings of the form 'attribute_name: $attribute_name'
-        # The '$' characters designate the data binding to later perform
-        pair_list = [F"{key}: ${key}" for key in items]
-        #print("pair_list: ", pair_list)             # EXAMPLE:  ['id: $id', 'gender: $gender']
+        return counters
 
-        # Merge all the strings in the list into a single comma-separated string
-        separator_string = ", "
-        attributes_str = separator_string.join(pair_list)   # EXAMPLE:   "id: $id, gender: $gender"
-        #print("attributes_str: ", attributes_str)
 
-        # Assemble the complete Cypher query
-        cypher = "CREATE (:%s {%s})" % (label, attributes_str)
-        #print("Cypher query: ", cypher)            # EXAMPLE: "CREATE (:test {id: $id, gender: $gender})"
 
-        # Run the Cypher query just created
-        result = self.run_query(cypher, items)
-        print("Result of creating new node:", result.value())
+    def create_nodes(self, label: str, rows: [{}], batch_size=_BATCH_SIZE) -> int:
+        """
+        Create new nodes with the given label, one per dictionary in the rows list;
+        each dictionary contains the attributes/values of a node.
+        All the nodes are sent to the database in a single query (or one per batch of batch_size rows,
+        for very long lists), each run in a managed transaction, which gets automatically retried on transient errors
 
-        return result
+        EXAMPLE:
+            conn.create_nodes("patient", [{'id': 123, 'gender': 'M'}, {'id': 124, 'gender': 'F'}])
+
+        :param label:       A string with a Neo4j label
+        :param rows:        A list of dictionaries.  EXAMPLE: [{'id': 123, 'gender': 'M'}, {'id': 124, 'gender': 'F'}]
+        :param batch_size:  Max number of nodes to create in a single query
+
+        :return:            The number of nodes created
+        """
+
+        cypher = self._cypher_create_nodes(label)
+
+        nodes_created = 0
+        with self.new_session() as sess:
+            for batch in _chunks(rows, batch_size):
+                counters = sess.execute_write(_run_and_count, cypher, {"rows": batch})
+                nodes_created += counters.nodes_created
+
+        self._invalidate_labels([label])
+        self._advance_id_counter(label, rows)
+
+        return nodes_created
+
+
+
+    def upsert_nodes(self, label: str, rows: [{}], key="id", ensure_constraint=False, batch_size=_BATCH_SIZE) -> int:
+        """
+        Create or update nodes with the given label, one per dictionary in the rows list, matching them by the given key attribute:
+        nodes not yet present are created with all the attributes of their row, while existing nodes get the attributes
+        of their row added or overwritten (any other attributes are left untouched).
+        Idempotent, and atomic for each node - unlike a loop of next_available_id() and create_node().
+        All the rows are sent to the database in a single query (or one per batch of batch_size rows,
+        for very long lists), each run in a managed transaction, which gets automatically retried on transient errors
+
+        Unless the key attribute is indexed, each row scans all the nodes with the label:
+        set up a uniqueness constraint (which is backed by an index) once, with create_unique_constraint(label, key).
+        That requires schema privileges, and fails if the database already contains duplicate values of the key,
+        or a plain index on the same label and key
+
+        EXAMPLE:
+            conn.upsert_nodes("patient", [{'id': 123, 'gender': 'M'}, {'id': 124, 'gender': 'F'}])
+
+        :param label:               A string with a Neo4j label
+        :param rows:                A list of dictionaries, each of which must contain the key attribute.
+                                        EXAMPLE: [{'id': 123, 'gender': 'M'}, {'id': 124, 'gender': 'F'}]
+        :param key:                 A string with the name of the attribute that identifies the nodes.  Default: "id"
+        :param ensure_constraint:   If True, first make sure that a uniqueness constraint exists on the label and key,
+                                        with create_unique_constraint() (only once per label and key).  Default: False
+        :param batch_size:          Max number of rows to send in a single query
+
+        :return:                    The number of nodes created (the other rows updated existing nodes)
+        """
+
+        if ensure_constraint and (label, key) not in self._constrained:
+            self.create_unique_constraint(label, key)
+
+        cypher = self._cypher_upsert_nodes(label, key)
+
+        nodes_created = 0
+        with self.new_session() as sess:
+            for batch in _chunks(rows, batch_size):
+                counters = sess.execute_write(_run_and_count, cypher, {"rows": batch})
+                nodes_created += counters.nodes_created
+
+        self._invalidate_labels([label])
+        self._advance_id_counter(label, rows)
+
+        return nodes_created
 
 
 
@@ -522,79 +1309,293 @@ class Neo4jLiaison:
         :return:                    None
         """
 
-        cypher = F"MATCH (n:{label}) WHERE n.id = $node_id SET n.{attribute_name} = $new_attribute_value"   # Assemble the Cypher string
-        print(F"In change_single_attribute_by_id(). Node id: {node_id} | cypher: `{cypher}` | new_attribute_value: `{new_attribute_value}`")
+        cypher = self._cypher_change_attribute(label, attribute_name)
+        logger.debug("In change_single_attribute_by_id(). Node id: %s | cypher: `%s` | new_attribute_value: `%s`",
+                     node_id, cypher, new_attribute_value)
 
         cypher_dict = {"node_id": node_id, "new_attribute_value": new_attribute_value}
-        result_obj = self.run_query(cypher, cypher_dict)    # A neo4j.Result object;
-                                                            # more specifically, an object of type neo4j.work.result.Result
-                                                            # See https://neo4j.com/docs/api/python-driver/current/api.html#neo4j.Result
-
-        #print("Result: ", result_obj)   # It shows: <neo4j.work.result.Result object at 0x7fee788de250>
-        #print("Result keys: ", result_obj.keys())   # It shows: []
-        #print("Result value: ", result_obj.value())   # It shows: []
-        #print("Result values: ", result_obj.values())   # It shows: []
-        #print("Result data: ", result_obj.data())   # It shows: []
+        # Run the query; the result (a neo4j.Result object) is fully consumed before the session closes,
+        # so that the change is carried out before evicting the affected cached results
+        self._run(cypher, cypher_dict, consumer=lambda result_obj: result_obj.consume(), write=True)
 
-        #record = result_obj.single()
-        #print("record:", record)                   # It shows: None
-        #value = record.value()                     # Cannot be carried out on a None
-        #info = result_obj.consume()
+        self._invalidate_labels([label])
 
         return
 
 
 
+    def change_attributes_bulk(self, label: str, updates: [{}], batch_size=_BATCH_SIZE) -> int:
+        """
+        Modify attribute values in many nodes at once, each specified by its label and "id" attribute.
+        All the changes are sent to the database in a single query (or one per batch of batch_size updates,
+        for very long lists), each run in a managed transaction, which gets automatically retried on transient errors.
+        Attributes not mentioned in an update are left untouched.
+        In case of error, an Exception is thrown
+
+        Every lookup is by "id":  unless that attribute is indexed, each update will scan all the nodes with the label.
+        A uniqueness constraint, which is backed by an index, can be set up once with create_unique_constraint(label)
+
+        EXAMPLE:
+            conn.change_attributes_bulk("task", [{"id": 12, "props": {"status": "waiting"}},
+                                                 {"id": 15, "props": {"status": "waiting", "retries": 0}}])
+
+        :param label:       A string with a Neo4j label
+        :param updates:     A list of dictionaries, each with the keys "id" (the value of the "id" attribute of the node to modify)
+                                and "props" (a dictionary with the attribute names/values to set)
+        :param batch_size:  Max number of updates to send in a single query
+
+        :return:            The number of attribute values set
+        """
+
+        cypher = self._cypher_change_attributes_bulk(label)
+
+        properties_set = 0
+        with self.new_session() as sess:
+            for batch in _chunks(updates, batch_size):
+                counters = sess.execute_write(_run_and_count, cypher, {"updates": batch})
+                properties_set += counters.properties_set
+
+        self._invalidate_labels([label])
+
+        return properties_set
+
+
+
     ###################################################################################
     #                                                                                 #
     #                       METHODS TO RUN GENERIC QUERIES                            #
     #                                                                                 #
     ###################################################################################
 
-    def run_query(self, cypher: str, cypher_dict=None):
+    def run_query(self, cypher: str, cypher_dict=None) -> [{}]:
         """
-        Run a general Cypher query
+        Run a general Cypher query, in a new session, as a managed write transaction
+        (automatically retried in case of transient errors).
+        If the query writes "id" values, call refresh_id_counter() afterwards (see next_available_ids())
 
         :param cypher:      A string containing a Cypher query, possibly with some substrings such a "$node_id", indicating data binding
         :param cypher_dict: EXAMPLE, assuming that the cypher string contains the substrings "$node_id" and "$attribute_value":
                                         {'node_id': 20, 'attribute_value': 'My value'}
 
-        :return:            A neo4j.Result object.  See https://neo4j.com/docs/api/python-driver/current/api.html#neo4j.Result
+        :return:            A (possibly empty) list of dictionaries, one per returned record, as produced by neo4j.Result.data()
+                                See https://neo4j.com/docs/api/python-driver/current/api.html#neo4j.Result
+                                (the Result object itself cannot be returned, since it's only valid while its session is open)
         """
-        sess = self.get_session()       # Retrieve or create a "session" object
+        logger.debug("In run_query().  Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
 
-        if cypher_dict is None:
-            cypher_dict = {}
+        result_list = self._run(cypher, cypher_dict, write=True)
+        self._invalidate_all()
+
+        return result_list
 
-        print("In run_query().  Cypher query: ", cypher)
-        print("Cypher dictionary: ", cypher_dict)
 
-        result_obj = sess.run(cypher, cypher_dict)     # A new neo4j.Result object
 
-        return result_obj
+    def execute(self, cypher: str, params=None, *, write=False) -> [{}]:
+        """
+        Run a general Cypher query, in a new session, as a managed read or write transaction
+        (automatically retried in case of transient errors).
+        Unlike run_query(), read-only queries can be run as read transactions, which a cluster can route to any of its members
 
+        EXAMPLE:
+            result_list = conn.execute("MATCH (n:patient) RETURN count(n) AS n_patients")
+            conn.execute("MATCH (n:patient {id: $id}) DETACH DELETE n", {"id": 123}, write=True)
+
+        :param cypher:  A string containing a Cypher query, possibly with some substrings such a "$node_id", indicating data binding
+        :param params:  Dictionary of data binding for the Cypher string.  EXAMPLE: {"node_id": 20}
+        :param write:   If True, run the query as a write transaction; otherwise, as a read one
+                            (in which the database will reject any attempt to modify data)
+
+        :return:        A (possibly empty) list of dictionaries, one per returned record, as produced by neo4j.Result.data()
+        """
+        logger.debug("In execute().  Cypher query: %s | Cypher dictionary: %s | write: %s", cypher, params, write)
+
+        result_list = self._run(cypher, params, write=write)
+        if write:
+            self._invalidate_all()      # In case the query modified the data
+
+        return result_list
+
+# END class "Neo4jLiaison"
+
+
+
+class AsyncNeo4jLiaison(_CypherCompiler):
+    """
+    An asyncio version of the core query methods of Neo4jLiaison, based on the driver's AsyncGraphDatabase.
+    Independent queries can be run concurrently, each on its own pooled connection, so that they complete
+    in about the time of the slowest one, rather than in the sum of their times.  EXAMPLE:
+
+        liaison = AsyncNeo4jLiaison("neo4j://localhost:7687", "neo4j", "my_password", database="neo4j")
+        results, doctors = await asyncio.gather(liaison.retrieve_children("patient", 123, "HAS_RESULT"),
+                                                liaison.retrieve_children("patient", 123, "TREATED_BY"))
+        await liaison.close()
+
+    Unlike Neo4jLiaison, results aren't cached, and each object owns its driver
+    (async drivers are bound to the event loop that uses them):  remember to close() it.
+    Requires version 5.8 or later of the Neo4j Python Driver
+    """
+
+    def __init__(self, url: str, user: str, pwd: str, *,
+                 max_connection_pool_size=100, connection_acquisition_timeout=60.0, max_connection_lifetime=3600,
+                 keep_alive=True, database=None):
+        """
+        Same arguments as the homonymous ones of Neo4jLiaison.
+        As there, passing the database name is recommended, to save the round trips to resolve the home database
+        """
 
+        self._driver = None             # Object to connect to Neo4j's Bolt driver for Python (asyncio version)
+        self._db = database             # Name of the database used by all sessions
+        self._cypher_cache = {}         # Compiled Cypher strings.  Key: (method_name, label, rel_name, tuple of attribute names)
 
-    def query_NOT_IN_USE(self, query, db=None):
-        # Execute a general Cypher query (NOT YET TESTED)  TODO: look into this variant
-        assert self._driver is not None, "Driver not initialized!"
-        session = None
-        response = None
         try:
-            if db is not None:
-                session = self._driver.sess(database=db)
+            self._driver = AsyncGraphDatabase.driver(url, auth=(user, pwd),    # Create a driver object
+                                                     max_connection_pool_size=max_connection_pool_size,
+                                                     connection_acquisition_timeout=connection_acquisition_timeout,
+                                                     max_connection_lifetime=max_connection_lifetime,
+                                                     keep_alive=keep_alive)
+        except Exception as ex:
+            error_msg = "CHECK IF NEO4J IS RUNNING! While instantiating the AsyncNeo4jLiaison object, failed to create the driver: " + str(ex)
+            raise Exception (error_msg)
+
+
+
+    async def close(self) -> None:
+        """
+        Terminate the database connections of this object
+
+        :return:    None
+        """
+
+        if self._driver is not None:
+            await self._driver.close()
+            self._driver = None
+
+
+
+    async def _run(self, cypher: str, cypher_dict=None, consumer=None, write=True):
+        """
+        Same as Neo4jLiaison._run(), except that the consumer must be a coroutine function
+        (e.g. lambda result_obj: result_obj.single() , since all the methods of neo4j.AsyncResult are coroutines)
+        """
+
+        if self._driver is None:
+            raise Exception("Calling the _run() method, but self._driver isn't set")
+
+        if cypher_dict is None:
+            cypher_dict = {}
+
+        if consumer is None:
+            consumer = lambda result_obj: result_obj.data()
+
+        async def work(tx):
+            result_obj = await tx.run(cypher, cypher_dict)     # A new neo4j.AsyncResult object, only valid while the transaction is open
+            return await consumer(result_obj)
+
+        # The driver's bookmark manager lets every query see the changes made by the previous ones (even in a cluster)
+        async with self._driver.session(database=self._db,
+                                        bookmark_manager=self._driver.execute_query_bookmark_manager) as sess:
+            if write:
+                return await sess.execute_write(work)
             else:
-                self._driver.sess()
+                return await sess.execute_read(work)
 
-            response = list(session.run(query))
 
-        except Exception as ex:
-            print("Query failed:", ex)
 
-        finally:
-            if session is not None:
-                session.close()
+    async def retrieve_node_by_label_and_id(self, label: str, id_value: int) -> {}:
+        """
+        Same as Neo4jLiaison.retrieve_node_by_label_and_id(), but not cached
 
-        return response
+        :return:    A dictionary with the record information (the node's attribute names are the keys), if found;
+                        if not found, return None
+        """
+        cypher = self._cypher_node_by_id(label)
 
-# END class "Neo4jLiaison"
+        record = await self._run(cypher, {"id": id_value}, consumer=lambda result_obj: result_obj.single(), write=False)
+        if record is None:
+            return None
+
+        return dict(record[0].items())
+
+
+
+    async def retrieve_node_by_label_and_clause(self, label: str, clause: {}) -> [{}]:
+        """
+        Same as Neo4jLiaison.retrieve_node_by_label_and_clause()
+
+        :return:    A list whose entries are dictionaries with each record's information (the node's attribute names are the keys)
+        """
+        if not isinstance(clause, dict):
+            raise Exception("retrieve_node_by_label_and_clause(): the clause must be a dictionary of attribute names/values")
+
+        cypher = self._cypher_node_by_clause(label, tuple(sorted(clause)))
+        logger.debug("In AsyncNeo4jLiaison.retrieve_node_by_label_and_clause(). Cypher query: %s", cypher)
+
+        return [record["n"] for record in await self._run(cypher, clause, write=False)]
+
+
+
+    async def retrieve_children(self, label, id_value, rel_name: str) -> [{}]:
+        """
+        Same as Neo4jLiaison.retrieve_children(), but not cached
+
+        :return:    A list of dictionaries - one list item per child node.
+                    Each dictionary contains the record information of a node (the node's attribute names are the keys)
+        """
+        cypher = self._cypher_children(label, rel_name)
+        logger.debug("In AsyncNeo4jLiaison.retrieve_children(): %s", cypher)
+
+        return [record["m"] for record in await self._run(cypher, {"id": id_value}, write=False)]
+
+
+
+    async def query_list_single_field(self, field_name: str, cypher: str, cypher_dict=None, write=True) -> []:
+        """
+        Same as Neo4jLiaison.query_list_single_field(), but not cached
+
+        :return:    A list of values for the requested field (attribute)
+        """
+        logger.debug("In AsyncNeo4jLiaison.query_list_single_field(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
+
+        return await self._run(cypher, cypher_dict,
+                               consumer=lambda result_obj: result_obj.value(_column_key(result_obj, field_name)), write=write)
+
+
+
+    async def query_list_multiple_fields_dict(self, cypher: str, cypher_dict=None, write=True) -> [{}]:
+        """
+        Same as Neo4jLiaison.query_list_multiple_fields_dict(), but not cached
+
+        :return:    A list whose entries are dictionaries with each record's information
+        """
+        logger.debug("In AsyncNeo4jLiaison.query_list_multiple_fields_dict(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
+
+        return await self._run(cypher, cypher_dict, write=write)
+
+
+
+    async def query_list_multiple_fields(self, cypher: str, cypher_dict=None, write=True) -> [()]:
+        """
+        Same as Neo4jLiaison.query_list_multiple_fields()
+
+        :return:    A list of tuples
+        """
+        logger.debug("In AsyncNeo4jLiaison.query_list_multiple_fields(). Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
+
+        async def to_tuples(result_obj):
+            return [tuple(record) async for record in result_obj]
+
+        return await self._run(cypher, cypher_dict, consumer=to_tuples, write=write)
+
+
+
+    async def run_query(self, cypher: str, cypher_dict=None) -> [{}]:
+        """
+        Same as Neo4jLiaison.run_query():  run a general Cypher query, as a managed write transaction
+
+        :return:    A (possibly empty) list of dictionaries, one per returned record
+        """
+        logger.debug("In AsyncNeo4jLiaison.run_query().  Cypher query: %s | Cypher dictionary: %s", cypher, cypher_dict)
+
+        return await self._run(cypher, cypher_dict, write=True)
+
+# END class "AsyncNeo4jLiaison"
@@ -0,0 +1,562 @@
+# Unit tests for Neo4jLiaison, run against a stub driver (no database needed).  Run with:  python -m pytest -q
+
+import asyncio
+import sys
+from os import path
+from types import SimpleNamespace
+
+sys.path.insert(0, path.join(path.dirname(path.dirname(path.abspath(__file__))), "src"))
+
+import pytest
+from neo4j.exceptions import SessionExpired
+
+import neo4j_liaison
+
+
+
+class StubRecord(tuple):
+    # Minimal stand-in for neo4j.Record:  a tuple of values, that can also be accessed by key
+    def __new__(cls, record):
+        obj = super().__new__(cls, record.values())
+        obj.record = record
+        return obj
+
+    def __getitem__(self, key):
+        return self.record[key] if isinstance(key, str) else super().__getitem__(key)
+
+    def data(self):
+        return dict(self.record)
+
+
+class StubNode(dict):
+    # Minimal stand-in for neo4j.graph.Node:  a dictionary of its properties, with a set of labels
+    def __init__(self, labels, properties):
+        super().__init__(properties)
+        self.labels = frozenset(labels)
+
+
+class StubResult:
+    # Minimal stand-in for neo4j.Result, holding a fixed list of records (each a dictionary), and the update counters
+    def __init__(self, records, counters=None):
+        self.records = records
+        self.counters = SimpleNamespace(**{"nodes_created": 0, "properties_set": 0, **(counters or {})})
+
+    def __iter__(self):
+        for r in self.records:
+            if isinstance(r, Exception):
+                raise r         # Simulates a failure while the records are streaming in
+            yield StubRecord(r)
+
+    def keys(self):
+        return list(self.records[0].keys()) if self.records else []
+
+    def data(self):
+        return [dict(r) for r in self.records]
+
+    def value(self, key=0):
+        return [list(r.values())[key] if isinstance(key, int) else r.get(key) for r in self.records]
+
+    def consume(self):
+        return SimpleNamespace(counters=self.counters)
+
+    def single(self):
+        return StubRecord(self.records[0]) if self.records else None
+
+
+class StubTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, cypher, parameters=None):
+        self.driver.queries.append((cypher, parameters))
+        return StubResult(self.driver.responder(cypher, parameters), self.driver.counters(cypher, parameters))
+
+
+class StubSession:
+    def __init__(self, driver, **kwargs):
+        self.driver = driver
+        self.kwargs = kwargs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def run(self, cypher, parameters=None):
+        return StubTransaction(self.driver).run(cypher, parameters)
+
+    def execute_read(self, work, *args):
+        self.driver.access_modes.append("READ")
+        return work(StubTransaction(self.driver), *args)
+
+    def execute_write(self, work, *args):
+        self.driver.access_modes.append("WRITE")
+        return work(StubTransaction(self.driver), *args)
+
+
+class StubDriver:
+    def __init__(self):
+        self.queries = []                           # Pairs (cypher, parameters) of all the queries run
+        self.responder = lambda cypher, params: []  # Function returning the records for a query
+        self.counters = lambda cypher, params: {}   # Function returning the update counters for a query
+        self.execute_query_bookmark_manager = object()
+        self.sessions = []                          # All the sessions opened
+        self.access_modes = []                      # "READ" or "WRITE", for each managed transaction
+
+    def session(self, **kwargs):
+        self.sessions.append(StubSession(self, **kwargs))
+        return self.sessions[-1]
+
+    def close(self):
+        pass
+
+
+class AsyncStubResult:
+    # Minimal stand-in for neo4j.AsyncResult, wrapping a StubResult.  As in the real one, keys() is not a coroutine
+    def __init__(self, result):
+        self.result = result
+
+    def keys(self):
+        return self.result.keys()
+
+    async def data(self):
+        return self.result.data()
+
+    async def value(self, key=0):
+        return self.result.value(key)
+
+    async def single(self):
+        return self.result.single()
+
+    async def __aiter__(self):
+        for record in self.result:
+            yield record
+
+
+class AsyncStubTransaction(StubTransaction):
+    async def run(self, cypher, parameters=None):
+        return AsyncStubResult(super().run(cypher, parameters))
+
+
+class AsyncStubSession(StubSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute_read(self, work, *args):
+        self.driver.access_modes.append("READ")
+        return await work(AsyncStubTransaction(self.driver), *args)
+
+    async def execute_write(self, work, *args):
+        self.driver.access_modes.append("WRITE")
+        return await work(AsyncStubTransaction(self.driver), *args)
+
+
+class AsyncStubDriver(StubDriver):
+    def session(self, **kwargs):
+        self.sessions.append(AsyncStubSession(self, **kwargs))
+        return self.sessions[-1]
+
+    async def close(self):
+        pass
+
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    stub = StubDriver()
+    monkeypatch.setattr(neo4j_liaison.GraphDatabase, "driver", lambda *args, **kwargs: stub)
+    yield stub
+    neo4j_liaison.shutdown_all()
+
+
+@pytest.fixture
+def async_driver(monkeypatch):
+    stub = AsyncStubDriver()
+    monkeypatch.setattr(neo4j_liaison.AsyncGraphDatabase, "driver", lambda *args, **kwargs: stub)
+    return stub
+
+
+
+def test_next_available_id_for_label_without_nodes(driver):
+    # The database returns no row at all for a label without nodes
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    assert conn.next_available_id("new_label") == 1
+    assert conn.next_available_id("new_label") == 2
+
+    cypher = driver.queries[0][0]
+    assert "WITH max(n.id) AS m" in cypher      # The aggregation must not be grouped by the label literal
+
+
+
+def test_next_available_ids_after_existing_nodes(driver):
+    driver.responder = lambda cypher, params: [{"label": "patient", "max_value": 524}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    assert conn.next_available_ids("patient", 3) == 524
+    assert conn.next_available_id("patient") == 527
+    assert len(driver.queries) == 1             # Only the first call queries the database
+
+
+
+def test_prime_id_counters_with_missing_labels(driver):
+    driver.responder = lambda cypher, params: [{"label": "patient", "max_value": 10}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    conn.prime_id_counters(["patient", "doctor"])
+
+    assert conn.next_available_id("patient") == 10
+    assert conn.next_available_id("doctor") == 1
+    assert len(driver.queries) == 1
+
+
+
+def test_id_counters_shared_among_objects(driver):
+    driver.responder = lambda cypher, params: [{"label": "patient", "max_value": 5}]
+    conn1 = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+    conn2 = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    conn1.prime_id_counters(["patient"])
+    conn2.prime_id_counters(["patient"])
+
+    issued = [conn1.next_available_id("patient"), conn2.next_available_id("patient"),
+              conn1.next_available_id("patient"), conn2.next_available_id("patient")]
+    assert issued == [5, 6, 7, 8]
+
+
+
+def test_refresh_id_counter_never_moves_backwards(driver):
+    driver.responder = lambda cypher, params: [{"label": "patient", "max_value": 5}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    assert conn.next_available_ids("patient", 10) == 5      # Reserves 5 to 14, not yet written to the database
+
+    conn.refresh_id_counter("patient")                      # The database still reports 5 as the next value
+    assert conn.next_available_id("patient") == 15
+
+    driver.responder = lambda cypher, params: [{"label": "patient", "max_value": 100}]     # Another process added nodes
+    conn.refresh_id_counter("patient")
+    assert conn.next_available_id("patient") == 100
+
+
+
+def test_sessions_share_the_bookmark_manager(driver):
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", database="neo4j")
+
+    conn.run_query("CREATE (n:patient {id: 1})")
+    conn.query_list_multiple_fields("MATCH (n:patient) RETURN n.id", write=False)
+
+    assert len(driver.sessions) == 2
+    for sess in driver.sessions:
+        assert sess.kwargs == {"database": "neo4j", "bookmark_manager": driver.execute_query_bookmark_manager}
+
+
+
+def test_transaction_type_is_not_guessed_from_the_cypher_text(driver):
+    driver.responder = lambda cypher, params: [{"n.set": "A"}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", query_cache_size=16)
+
+    # A read-only query whose text happens to contain "set"
+    assert conn.query_list_single_field("n.set", "MATCH (n) RETURN n.set", write=False) == ["A"]
+    assert conn.query_list_single_field("n.set", "MATCH (n) RETURN n.set", write=False) == ["A"]
+    assert driver.access_modes == ["READ"]      # The second call was served from the cache
+
+    # A write query whose text contains no "CREATE" clause, and which must therefore not be cached
+    conn.query_list_multiple_fields("CALL apoc.create.node(['patient'], {id: 1})")
+    conn.query_list_multiple_fields("CALL apoc.create.node(['patient'], {id: 1})")
+    assert driver.access_modes == ["READ", "WRITE", "WRITE"]
+
+    conn.query_list_single_field("n.set", "MATCH (n) RETURN n.set", write=False)
+    assert driver.access_modes == ["READ", "WRITE", "WRITE", "READ"]    # The write discarded the cached result
+
+
+
+def test_internal_lookups_use_read_transactions(driver):
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    conn.retrieve_node_by_label_and_id("patient", 1)
+    conn.retrieve_node_by_label_and_clause("patient", {"name": "Jill"})
+    conn.retrieve_children("patient", 1, "HAS_RESULT")
+    conn.next_available_id("patient")
+
+    assert driver.access_modes == ["READ"] * 4
+
+
+
+def test_query_cache_is_opt_in(driver):
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    conn.query_list_multiple_fields_dict("MATCH (n:patient) RETURN n.id AS id", write=False)
+    conn.query_list_multiple_fields_dict("MATCH (n:patient) RETURN n.id AS id", write=False)
+
+    assert len(driver.queries) == 2
+
+
+
+def test_cached_query_results_cannot_be_altered_by_the_caller(driver):
+    driver.responder = lambda cypher, params: [{"n": {"id": 1, "tags": ["a", "b"]}}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", query_cache_size=16)
+
+    first = conn.query_list_multiple_fields_dict("MATCH (n:patient) RETURN n", write=False)
+    first[0]["n"]["tags"].append("c")
+
+    second = conn.query_list_multiple_fields_dict("MATCH (n:patient) RETURN n", write=False)
+    assert second == [{"n": {"id": 1, "tags": ["a", "b"]}}]
+    assert len(driver.queries) == 1
+
+
+
+def test_iter_children_shares_the_cypher_of_retrieve_children(driver):
+    driver.responder = lambda cypher, params: [{"m": {"id": 190}, "labels": ["result"]}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    assert list(conn.iter_children("patient", 1, "HAS_RESULT")) == [{"id": 190}]
+    assert conn.retrieve_children("patient", 1, "HAS_RESULT") == [{"id": 190}]
+
+    assert driver.queries[0][0] == driver.queries[1][0]
+
+
+
+def test_onehop_cache_is_opt_in(driver):
+    driver.responder = lambda cypher, params: [{"n": StubNode(["patient"], {"id": 1})}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    assert conn.retrieve_node_by_label_and_id("patient", 1) == {"id": 1}
+    assert conn.retrieve_node_by_label_and_id("patient", 1) == {"id": 1}
+
+    assert len(driver.queries) == 2
+
+
+
+def test_onehop_cached_results_cannot_be_altered_by_the_caller(driver):
+    driver.responder = lambda cypher, params: [{"n": StubNode(["patient"], {"id": 1, "tags": ["a"]})}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", onehop_cache_size=16)
+
+    conn.retrieve_node_by_label_and_id("patient", 1)["tags"].append("ZZZ")      # Altering the result of a cache miss...
+    conn.retrieve_node_by_label_and_id("patient", 1)["tags"].append("ZZZ")      # ...and of a cache hit
+
+    assert conn.retrieve_node_by_label_and_id("patient", 1) == {"id": 1, "tags": ["a"]}
+    assert len(driver.queries) == 1
+
+    driver.responder = lambda cypher, params: [{"m": {"id": 2, "tags": ["b"]}, "labels": ["result"]}]
+    conn.retrieve_children("patient", 1, "HAS_RESULT")[0]["tags"].append("ZZZ")
+    conn.retrieve_children("patient", 1, "HAS_RESULT")[0]["tags"].append("ZZZ")
+
+    assert conn.retrieve_children("patient", 1, "HAS_RESULT") == [{"id": 2, "tags": ["b"]}]
+    assert len(driver.queries) == 2
+
+
+
+def test_onehop_cache_invalidated_by_label(driver):
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", onehop_cache_size=16)
+
+    driver.responder = lambda cypher, params: [{"n": StubNode(["patient"], {"id": 1})}]
+    conn.retrieve_node_by_label_and_id("patient", 1)
+    driver.responder = lambda cypher, params: [{"m": {"id": 2}, "labels": ["result"]}]
+    conn.retrieve_children("doctor", 7, "TREATS")
+    assert len(driver.queries) == 2
+
+    conn.change_single_attribute_by_id("result", 2, "value", 12.3)     # A child's label:  only retrieve_children() is affected
+    driver.responder = lambda cypher, params: [{"n": StubNode(["patient"], {"id": 1})}]
+    conn.retrieve_node_by_label_and_id("patient", 1)
+    assert len(driver.queries) == 3
+
+    driver.responder = lambda cypher, params: [{"m": {"id": 2, "value": 12.3}, "labels": ["result"]}]
+    assert conn.retrieve_children("doctor", 7, "TREATS") == [{"id": 2, "value": 12.3}]
+    assert len(driver.queries) == 4
+
+
+
+def test_write_generator_closed_early_clears_the_caches(driver):
+    driver.responder = lambda cypher, params: [{"m": {"id": 2}, "labels": ["result"]}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", onehop_cache_size=16)
+    conn.retrieve_children("patient", 1, "HAS_RESULT")
+
+    driver.responder = lambda cypher, params: [{"m": {"id": 2}}, {"m": {"id": 3}}]
+    gen = conn.iter_query_list_multiple_fields_dict("MATCH (m:result) SET m.checked = true RETURN m", write=True)
+    next(gen)
+    gen.close()
+
+    driver.responder = lambda cypher, params: [{"m": {"id": 2, "checked": True}, "labels": ["result"]}]
+    assert conn.retrieve_children("patient", 1, "HAS_RESULT") == [{"id": 2, "checked": True}]
+    assert len(driver.queries) == 3
+
+
+
+def test_explicit_id_writes_move_the_id_counter_forward(driver):
+    driver.responder = lambda cypher, params: [{"label": "patient", "max_value": 5}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+    assert conn.next_available_id("patient") == 5
+
+    driver.responder = lambda cypher, params: []
+    conn.upsert_nodes("patient", [{"id": 1000}, {"id": 7}])
+    assert conn.next_available_id("patient") == 1001
+
+    conn.create_nodes("patient", [{"id": 2000, "name": "Jill"}])
+    assert conn.next_available_id("patient") == 2001
+
+    conn.create_node("patient", {"id": 10})       # Below the counter:  no effect
+    conn.create_node("patient", {"name": "Jack"})
+    assert conn.next_available_id("patient") == 2002
+
+
+
+def test_upsert_nodes_in_batches(driver):
+    driver.counters = lambda cypher, params: {"nodes_created": len(params["rows"]) - 1}   # One row per batch updates a node
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    rows = [{"id": i, "gender": "F"} for i in range(1, 6)]
+    assert conn.upsert_nodes("patient", rows, batch_size=2) == 2      # Batches of 2, 2 and 1 rows
+
+    assert [params for (cypher, params) in driver.queries] == [{"rows": rows[0:2]}, {"rows": rows[2:4]}, {"rows": rows[4:]}]
+    assert {cypher for (cypher, params) in driver.queries} == \
+           {"UNWIND $rows AS r MERGE (n:patient {id: r.id}) ON CREATE SET n = r ON MATCH SET n += r"}    # No constraint by default
+    assert driver.access_modes == ["WRITE"] * 3
+
+
+
+def test_upsert_nodes_ensuring_the_constraint(driver):
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    conn.upsert_nodes("patient", [{"code": "A1"}], key="code", ensure_constraint=True)
+    conn.upsert_nodes("patient", [{"code": "A2"}], key="code", ensure_constraint=True)
+
+    assert [cypher for (cypher, params) in driver.queries] == [
+        "CREATE CONSTRAINT IF NOT EXISTS FOR (n:patient) REQUIRE n.code IS UNIQUE",     # Only once
+        "UNWIND $rows AS r MERGE (n:patient {code: r.code}) ON CREATE SET n = r ON MATCH SET n += r",
+        "UNWIND $rows AS r MERGE (n:patient {code: r.code}) ON CREATE SET n = r ON MATCH SET n += r"]
+
+
+
+def failing_once(records):
+    # Return a responder that raises SessionExpired on its first call, and then returns the given records
+    calls = []
+    def responder(cypher, params):
+        calls.append(cypher)
+        if len(calls) == 1:
+            raise SessionExpired("Connection reset")
+        return records
+    return responder
+
+
+
+def test_streamed_read_retried_if_failing_before_any_record(driver):
+    driver.responder = failing_once([{"id": 1}, {"id": 2}])
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    assert list(conn.iter_query_list_multiple_fields("MATCH (n:patient) RETURN n.id", write=False)) == [(1,), (2,)]
+    assert len(driver.queries) == 2
+    assert len(driver.sessions) == 2        # The retry uses a fresh session
+
+
+
+def test_streamed_read_not_retried_more_than_once(driver):
+    def responder(cypher, params):
+        raise SessionExpired("Connection reset")
+    driver.responder = responder
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    with pytest.raises(SessionExpired):
+        list(conn.iter_query_list_multiple_fields("MATCH (n:patient) RETURN n.id", write=False))
+    assert len(driver.queries) == 2
+
+
+
+def test_streamed_read_not_retried_after_a_record_was_yielded(driver):
+    driver.responder = lambda cypher, params: [{"id": 1}, SessionExpired("Connection reset"), {"id": 2}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    received = []
+    with pytest.raises(SessionExpired):
+        for record in conn.iter_query_list_multiple_fields("MATCH (n:patient) RETURN n.id", write=False):
+            received.append(record)
+
+    assert received == [(1,)]
+    assert len(driver.queries) == 1
+
+
+
+def test_streamed_write_never_retried(driver):
+    driver.responder = failing_once([{"id": 1}])
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    with pytest.raises(SessionExpired):
+        list(conn.iter_query_list_multiple_fields("MATCH (n:patient) SET n.seen = true RETURN n.id", write=True))
+    assert len(driver.queries) == 1
+
+
+
+def test_async_read_write_routing(async_driver):
+    async def scenario():
+        conn = neo4j_liaison.AsyncNeo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", database="neo4j")
+        await conn.retrieve_node_by_label_and_id("patient", 1)
+        await conn.retrieve_children("patient", 1, "HAS_RESULT")
+        await conn.run_query("CREATE (n:patient {id: 2})")
+        await conn.query_list_multiple_fields_dict("MATCH (n:patient) RETURN n.id AS id", write=False)
+        await conn.query_list_multiple_fields_dict("CALL apoc.create.node(['patient'], {id: 3})")
+        await conn.close()
+
+    asyncio.run(scenario())
+
+    assert async_driver.access_modes == ["READ", "READ", "WRITE", "READ", "WRITE"]
+    for sess in async_driver.sessions:
+        assert sess.kwargs == {"database": "neo4j", "bookmark_manager": async_driver.execute_query_bookmark_manager}
+
+
+
+def test_async_query_list_single_field(async_driver):
+    async_driver.responder = lambda cypher, params: [{"name": "Jill", "user_id": 7}, {"name": "Jack", "user_id": 8}]
+
+    async def scenario():
+        conn = neo4j_liaison.AsyncNeo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+        found = await conn.query_list_single_field("user_id", "MATCH (n:patient) RETURN n.name AS name, n.id AS user_id",
+                                                   write=False)
+        missing = await conn.query_list_single_field("age", "MATCH (n:patient) RETURN n.name AS name, n.id AS user_id",
+                                                     write=False)
+        return found, missing
+
+    assert asyncio.run(scenario()) == ([7, 8], [None, None])
+
+
+
+def test_async_query_list_multiple_fields(async_driver):
+    async_driver.responder = lambda cypher, params: [{"b.name": "compoundX", "r.value": 12.34},
+                                                     {"b.name": "compoundY", "r.value": 4.09}]
+
+    async def scenario():
+        conn = neo4j_liaison.AsyncNeo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+        return await conn.query_list_multiple_fields("MATCH (r)-->(b) RETURN b.name, r.value", write=False)
+
+    assert asyncio.run(scenario()) == [("compoundX", 12.34), ("compoundY", 4.09)]
+    assert async_driver.access_modes == ["READ"]
+
+
+
+def test_execute_write_clears_the_caches(driver):
+    driver.responder = lambda cypher, params: [{"id": 1}]
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd", query_cache_size=16)
+
+    conn.query_list_single_field("id", "MATCH (n:patient) RETURN n.id AS id", write=False)
+    conn.execute("MATCH (n:patient) RETURN n.id AS id")                     # A read:  the cache is kept
+    conn.query_list_single_field("id", "MATCH (n:patient) RETURN n.id AS id", write=False)
+    assert len(driver.queries) == 2
+
+    conn.execute("CALL apoc.create.node(['patient'], {id: 2})", write=True)
+    conn.query_list_single_field("id", "MATCH (n:patient) RETURN n.id AS id", write=False)
+    assert len(driver.queries) == 4
+    assert driver.access_modes == ["READ", "READ", "WRITE", "READ"]
+
+
+
+def test_next_available_id_validates_the_label(driver):
+    conn = neo4j_liaison.Neo4jLiaison("neo4j://localhost:7687", "neo4j", "pwd")
+
+    for clause in ["", "type:'soc'"]:
+        with pytest.raises(Exception, match="Invalid label name"):
+            conn.next_available_id("patient) DETACH DELETE (n", clause)
+
+    assert driver.queries == []